@@ -7,19 +7,31 @@ for words found in the title
 @version 7/19/21
 """
 
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import json
 import os
 import re
+import sys
 import time
-
-import praw
+from typing import TYPE_CHECKING
 
 from data import Post, TermGroups
+import utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import praw  # Only imported by the caller when a feed needs to be refreshed, since it is slow to import
 
 
 class PostCache:
     _CACHE_FORMAT_VERSION = "2.0"
-    _CACHE_CACHE = {}  # A dictionary of PostCache objects for each subreddit
+    _CACHE_CACHE = {}  # A dictionary of loaded PostCache objects, keyed by the absolute path of their cache file
 
     # Scoring methods
     COUNT = 0
@@ -28,7 +40,7 @@ class PostCache:
     def __init__(self,
                  subreddit: str,
                  cache_file: str,
-                 reddit: praw.reddit,
+                 reddit: "praw.Reddit",
                  hot_ttl: int = 86400,
                  new_ttl: int = 21600,
                  top_ttl: int = 2592000):
@@ -39,45 +51,35 @@ class PostCache:
 
         :param subreddit: The name of the subreddit the posts are scraped from
         :param cache_file: The path of the cache file
+        :param reddit: The praw.Reddit instance used to refresh the cache, or a function which creates one.
+            The function is only called once a feed needs to be refreshed, and is called once for each feed
+            so the feeds can be fetched concurrently
         :param hot_ttl: The number of seconds before the hot feed is refreshed (Default: 24 hours)
         :param new_ttl: The number of seconds before the new feed is refreshed (Default: 6 hours)
         :param top_ttl: The number of seconds before the top feed is refreshed (Default: 30 days)
         """
-        self.subreddit = subreddit  # The name of the subreddit
-        self.feed_ages = {  # The time when feed was last refreshed
-            "hot": 0.0,
-            "new": 0.0,
-            "top": 0.0
-        }
-        self.ttl = {
-            "hot": hot_ttl,
-            "new": new_ttl,
-            "top": top_ttl
-        }
-        self.posts = set()  # A dictionary of all posts on the subreddit
-
-        self._cache_file = cache_file  # The filepath of the cache file
-        self._reddit = reddit  # praw.reddit instance
+        self._init_fields(subreddit, cache_file, reddit, hot_ttl, new_ttl, top_ttl)
 
         # If no cache file found, create one
         if not os.path.exists(self._cache_file):
             print(f"Alert: No cache file found for {subreddit} at '{self._cache_file}'")
             # Create empty cache file
-            with open(self._cache_file, 'w') as fp:
-                data = {
-                    "version": PostCache._CACHE_FORMAT_VERSION,
-                    "subreddit": self.subreddit,
-                    "feed_ages": self.feed_ages,
-                    "posts": []
-                }
-                json.dump(data, fp)
-                print("Created new cache file")
+            data = {
+                "version": PostCache._CACHE_FORMAT_VERSION,
+                "subreddit": self.subreddit,
+                "feed_ages": self.feed_ages,
+                "posts": []
+            }
+            _write_json(self._cache_file, data)
+            self._file_mtime = os.stat(self._cache_file).st_mtime_ns
+            self._file_fields = {key: value for key, value in data.items() if key != "posts"}
+            print("Created new cache file")
             return
 
         # If cache file exists, load it
         print(f"Checking cache for /r/{self.subreddit}")
-        with open(self._cache_file, 'r') as fp:
-            data = json.load(fp)
+        data = _read_json(self._cache_file)
+        self._file_mtime = os.stat(self._cache_file).st_mtime_ns  # Used to tell if the file changed since loading
 
         # Validate cache file
         required_keys = ["version", "subreddit", "feed_ages", "posts"]
@@ -93,53 +95,164 @@ class PostCache:
             raise ValueError(f"Cache contains incorrect subreddit: Expected '{self.subreddit.lower()}', "
                              f"was '{data['subreddit'].lower()}'")
 
-        # Convert dictionary data to Post objects and store
-        for post_data in data["posts"]:
-            post = Post(post_data["postID"], post_data["title"], post_data["score"])
-            self.posts.add(post)
+        # Convert dictionary data to Post objects and store. IDs are interned, so that
+        # the dictionary key and post share one string and comparing them is a pointer check
+        posts = (Post(sys.intern(post_data["postID"]), post_data["title"], post_data["score"])
+                 for post_data in data["posts"])
+        self.posts = {post.postID: post for post in posts}
         self.feed_ages = data["feed_ages"]
 
+        # Keep every other field in the file, so save() can preserve them without reading the file again
+        self._file_fields = {key: value for key, value in data.items() if key != "posts"}
+
         # Show cache size
         print(f"Cached posts: {len(self.posts)}")
 
+    def _init_fields(self,
+                     subreddit: str,
+                     cache_file: str,
+                     reddit: "praw.Reddit",
+                     hot_ttl: int,
+                     new_ttl: int,
+                     top_ttl: int) -> None:
+        """
+        Sets up the fields of an empty cache, before its posts are loaded
+
+        :param subreddit: The name of the subreddit the posts are scraped from
+        :param cache_file: The path of the cache file
+        :param reddit: The praw.Reddit instance used to refresh the cache, or a function which creates one
+        :param hot_ttl: The number of seconds before the hot feed is refreshed
+        :param new_ttl: The number of seconds before the new feed is refreshed
+        :param top_ttl: The number of seconds before the top feed is refreshed
+        """
+        self.subreddit = subreddit  # The name of the subreddit
+        self.feed_ages = {  # The time when feed was last refreshed
+            "hot": 0.0,
+            "new": 0.0,
+            "top": 0.0
+        }
+        self.ttl = {
+            "hot": hot_ttl,
+            "new": new_ttl,
+            "top": top_ttl
+        }
+        self.posts = {}  # A dictionary of all posts on the subreddit, keyed by post ID
+
+        self._cache_file = cache_file  # The filepath of the cache file
+        self._reddit = reddit  # praw.Reddit instance, or a function creating one
+
+    @classmethod
+    def get_or_create(cls,
+                      subreddit: str,
+                      cache_file: str,
+                      reddit: "praw.Reddit",
+                      hot_ttl: int = 86400,
+                      new_ttl: int = 21600,
+                      top_ttl: int = 2592000) -> "PostCache":
+        """
+        Returns the PostCache already loaded from a cache file, so that the file is only read and parsed once.
+        If the file has not been loaded, or has been modified since it was loaded, a new PostCache is created
+
+        :param subreddit: The name of the subreddit the posts are scraped from
+        :param cache_file: The path of the cache file
+        :param reddit: The praw.Reddit instance used to refresh the cache, or a function which creates one.
+            The function is only called once a feed needs to be refreshed, and is called once for each feed
+            so the feeds can be fetched concurrently
+        :param hot_ttl: The number of seconds before the hot feed is refreshed (Default: 24 hours)
+        :param new_ttl: The number of seconds before the new feed is refreshed (Default: 6 hours)
+        :param top_ttl: The number of seconds before the top feed is refreshed (Default: 30 days)
+
+        :return: The PostCache for the cache file
+        """
+        key = os.path.abspath(cache_file)
+        cache = cls._CACHE_CACHE.get(key)
+
+        if (cache is None
+                or type(cache) is not cls
+                or cache.subreddit.lower() != subreddit.lower()
+                or cache._is_modified()):
+            cache = cls(subreddit, cache_file, reddit, hot_ttl, new_ttl, top_ttl)
+            cls._CACHE_CACHE[key] = cache
+        else:
+            cache._reddit = reddit
+            cache.ttl = {
+                "hot": hot_ttl,
+                "new": new_ttl,
+                "top": top_ttl
+            }
+        return cache
+
     def count_words(self,
                     term_group: TermGroups = None,
                     ignore_title_regex: str = None,
                     require_title_regex: str = None,
-                    method: str = SCORE) -> {str: int}:
+                    method: str = SCORE,
+                    filtered_words: [str] = None,
+                    threshold: int = None,
+                    ignore_word_regex: str = None,
+                    require_word_regex: str = None) -> {str: int}:
         """
         Counts the frequency of every word in the titles of cached posts. A TermGroup can be used to specify
         words that should be considered one
 
         :param term_group: The TermGroup for the given search. If `None`, no TermGroup is used (Default: None)
                 If "None", no words will be filtered (Default: None)
-        :param ignore_title_regex: A regex pattern titles must NOT contain to be evaluated
-        :param require_title_regex: A regex pattern titles must contain to be evaluated
+        :param ignore_title_regex: A regex pattern (string or compiled) titles must NOT contain to be evaluated
+        :param require_title_regex: A regex pattern (string or compiled) titles must contain to be evaluated
         :param method: How words are scored. The default, COUNT, counts the number of posts that each word
                 appears, finding the most common word. SCORE adds up the scores of every post
                 containing the word, finding the 'most liked' word.
+        :param filtered_words: Words to exclude from the results. This check is case-insensitive.
+                Term group names are only excluded if their capitalization matches (Default: None)
+        :param threshold: Words scoring below this value are excluded from the results. If `None`,
+                no words are excluded by score (Default: None)
+        :param ignore_word_regex: A regex pattern (string or compiled) words must NOT contain to be in the results
+        :param require_word_regex: A regex pattern (string or compiled) words must contain to be in the results
 
         :return: A {str:int} dictionary, whose keys are words and values are the number of titles they appeared in
         """
 
+        # Filtered words are skipped while counting rather than removed afterwards. Words replaced by
+        # the term group are left out, as they only appear in the results under their group name
+        filtered_set = frozenset(word.lower() for word in filtered_words) if filtered_words else frozenset()
+        if term_group and filtered_set:
+            filtered_set = frozenset(word for word in filtered_set if term_group.sanitize(word) == word)
+
+        # Skip titles that fail the regex filters
+        posts = self._filtered_posts(ignore_title_regex, require_title_regex)
+
+        # Find the words in each title, minus the filtered words
+        if filtered_set:
+            term_lists = (post.term_list(term_group) - filtered_set for post in posts)
+        else:
+            term_lists = (post.term_list(term_group) for post in posts)
+
         # Perform search
-        word_frequency = {}
-
-        for post in self.posts:
-            term_list = post.term_list(term_group,
-                                       ignore_title_regex=ignore_title_regex,
-                                       require_title_regex=require_title_regex)
-            value = post.score if method == PostCache.SCORE else 1
-            for term in term_list:
-                if term in word_frequency:
-                    word_frequency[term] += value
-                else:
-                    word_frequency[term] = value
+        if method == PostCache.SCORE:
+            # Sum into a defaultdict, since Counter creates missing keys through a Python-level method
+            word_scores = defaultdict(int)
+            for post, term_list in zip(posts, term_lists):
+                score = post.score
+                for term in term_list:
+                    word_scores[term] += score
+            word_frequency = Counter(word_scores)
+        else:
+            # Count the words of every title in a single pass in C
+            word_frequency = Counter(chain.from_iterable(term_lists))
 
         # Restore capitalization on term groups
         if term_group:
             word_frequency = {term_group.sanitize(word): freq for (word, freq) in word_frequency.items()}
 
+        # Drop words below the threshold or failing the word filters, in a single pass over the results
+        if threshold is not None or ignore_word_regex or require_word_regex:
+            ignore_word = re.compile(ignore_word_regex).search if ignore_word_regex else None
+            require_word = re.compile(require_word_regex).search if require_word_regex else None
+            word_frequency = {word: freq for (word, freq) in word_frequency.items()
+                              if (threshold is None or freq >= threshold)
+                              and not (ignore_word and ignore_word(word))
+                              and (require_word is None or require_word(word))}
+
         return word_frequency
 
     def search_terms(self,
@@ -156,40 +269,103 @@ class PostCache:
         :param method: How words are scored. The default, COUNT, counts the number of posts that each word
                 appears, finding the most common word. SCORE adds up the scores of every post
                 containing the word, finding the 'most liked' word.
-        :param ignore_title_regex: A regex pattern titles must NOT contain to be evaluated
-        :param require_title_regex: A regex pattern titles must contain to be evaluated
+        :param ignore_title_regex: A regex pattern (string or compiled) titles must NOT contain to be evaluated
+        :param require_title_regex: A regex pattern (string or compiled) titles must contain to be evaluated
         :param ignore_case: Ignore case for term matching (default: True)
 
         :return: A {str:int} dictionary of how frequently words mapped to the number of titles they appeared in
         """
         # Create regex patterns
+        # When ignoring case, lowercase terms are matched against lowercase titles. This is cheaper than having
+        # the regex engine fold the case of every character it compares. Lowercasing can change the length of
+        # non-ASCII text (e.g. 'İ'), so non-ASCII terms and titles are matched with re.IGNORECASE instead
+        lower_terms = ignore_case and all(term.isascii() for group in searched_terms for term in group)
+        flags = re.IGNORECASE if ignore_case and not lower_terms else 0
         search_patterns = {}
+        search_groups = {}
         for group in searched_terms:
             # Compile all terms into a `(<A>|<B>|...)` regex string
-            escaped_list = [re.escape(term).strip() for term in group]
-            flags = re.IGNORECASE if ignore_case else 0
+            escaped_list = [re.escape(term.lower() if lower_terms else term).strip() for term in group]
             search_patterns[group[0]] = re.compile('\\b({})\\b'.format("|".join(escaped_list)), flags)
-
-        # Add groups to frequency dict
-        term_frequency = {}
-        for group in search_patterns:
-            term_frequency[group] = 0
-
-        # Perform search
-        for post in self.posts:
-            # Skip title if it fails regex filter
-            if ignore_title_regex and re.search(ignore_title_regex, post.title):
-                continue
-            elif require_title_regex and re.search(require_title_regex, post.title) is None:
-                continue
+            search_groups[group[0]] = group
+
+        if not search_patterns:
+            return {}
+
+        # Bind search methods once to avoid attribute lookups inside the loop
+        groups = list(search_patterns)
+        group_searches = [pattern.search for pattern in search_patterns.values()]
+        # Searches for titles which aren't ASCII, so aren't lowercased. The terms are ASCII, so
+        # the lowercase patterns ignoring case match the same titles the original terms would
+        unicode_searches = [re.compile(pattern.pattern, re.IGNORECASE).search for pattern in search_patterns.values()]
+
+        # Groups are counted by index, so the loop never has to hash the group names
+        group_frequency = [0] * len(groups)
+
+        # If available, find the groups in a title with a single pass of an Aho-Corasick automaton, checking
+        # the word boundaries of each match. Otherwise, combine every group into one pattern, so titles
+        # without any term are rejected in a single pass. The remaining groups are then checked individually,
+        # since a term can belong to more than one group
+        automaton = utils.build_automaton(list(search_groups.values()), ignore_case)
+        combined_search = re.compile("|".join(f"(?P<g{index}>{pattern.pattern})"
+                                              for index, pattern in enumerate(search_patterns.values())), flags).search
+        # Literal terms of each group, for a cheap substring test before confirming a group with its pattern.
+        # A substring test can't ignore case, so there are none when the patterns ignore case
+        group_literals = None if flags else [tuple(term.strip().lower() if lower_terms else term.strip()
+                                                   for term in group)
+                                             for group in search_groups.values()]
+        use_score = method == PostCache.SCORE
+
+        # Perform search on titles that pass the regex filters
+        for post in self._filtered_posts(ignore_title_regex, require_title_regex):
+            # Find the groups contained in the title
+            title = post.title_lower if lower_terms else post.title
+            if lower_terms and not post.title.isascii():
+                found = [index for index, search in enumerate(unicode_searches) if search(post.title)]
+            elif automaton:
+                found = set()
+                for end, (length, indices) in automaton.iter(title):
+                    if utils.is_word_boundary(title, end - length + 1) and utils.is_word_boundary(title, end + 1):
+                        found.update(indices)
+            else:
+                match = combined_search(title)
+                if match is None:
+                    continue
+                matched_index = int(match.lastgroup[1:])
+                found = [index for index, search in enumerate(group_searches)
+                         if index == matched_index
+                         or ((group_literals is None or any(term in title for term in group_literals[index]))
+                             and search(title))]
 
             # Increase the score of the groups found in the title
-            value = post.score if method == PostCache.SCORE else 1
-            for group, pattern in search_patterns.items():
-                term_frequency[group] += value if pattern.search(post.title) else 0
+            value = post.score if use_score else 1
+            for index in found:
+                group_frequency[index] += value
 
         # Return result
-        return term_frequency
+        return dict(zip(groups, group_frequency))
+
+    def _filtered_posts(self, ignore_title_regex: str = None, require_title_regex: str = None):
+        """
+        Selects the cached posts whose titles pass the title filters. The filters are compiled once, and
+        the check for which filters are in use is made once rather than for every post
+
+        :param ignore_title_regex: A regex pattern (string or compiled) titles must NOT contain to be evaluated
+        :param require_title_regex: A regex pattern (string or compiled) titles must contain to be evaluated
+
+        :return: A collection of the Posts passing both filters
+        """
+        if not ignore_title_regex and not require_title_regex:
+            return self.posts.values()
+
+        ignore_title = re.compile(ignore_title_regex).search if ignore_title_regex else None
+        require_title = re.compile(require_title_regex).search if require_title_regex else None
+        if not require_title:
+            return [post for post in self.posts.values() if not ignore_title(post.title)]
+        if not ignore_title:
+            return [post for post in self.posts.values() if require_title(post.title)]
+        return [post for post in self.posts.values()
+                if not ignore_title(post.title) and require_title(post.title)]
 
     def posts(self) -> list:
         """
@@ -197,7 +373,7 @@ class PostCache:
 
         :return: A list of every cached Post
         """
-        return list(self.posts)
+        return list(self.posts.values())
 
     def refresh(self,
                 force: bool = False,
@@ -216,72 +392,145 @@ class PostCache:
         """
 
         curr_time = time.time()
-        refreshed = False
-
-        # Create subreddit object
-        subreddit = self._reddit.subreddit(self.subreddit)
 
-        # Refresh every feed
+        # === Check which feeds need to be refreshed
+        expired_feeds = []
+        alerts = []  # Printed together once every feed is checked
         for feed_name in self.feed_ages:
             feed_age = self.feed_ages[feed_name]
 
-            # === Check if feed needs to be refreshed
-
             if force:
-                print(f"Alert: Forcing cache refresh on {feed_name}")
+                alerts.append(f"Alert: Forcing cache refresh on {feed_name}")
             elif (feed_age + self.ttl[feed_name]) < curr_time:
-                print(f"Alert: {feed_name} cache expired for /r/{self.subreddit} - "
-                      f"Refreshing feed...")
+                alerts.append(f"Alert: {feed_name} cache expired for /r/{self.subreddit} - "
+                              f"Refreshing feed...")
             else:
                 # Cache is still fresh and will not be updated
                 continue
-
-            # === Refresh expired feed
-            refreshed = True
-
-            # Get post generator
-            if feed_name == "hot":
-                generator = subreddit.hot(limit=limit)
-            elif feed_name == "new":
-                generator = subreddit.new(limit=limit)
+            expired_feeds.append(feed_name)
+        if alerts:
+            print("\n".join(alerts))
+
+        # === Refresh expired feeds
+        if expired_feeds:
+            if callable(self._reddit):
+                # Fetching is bound by network latency, so the feeds are fetched concurrently. PRAW is not
+                # thread safe, so each fetch is given its own Reddit instance from the factory
+                with ThreadPoolExecutor(max_workers=len(expired_feeds)) as executor:
+                    fetches = {feed_name: executor.submit(_fetch_feed, self._reddit(), self.subreddit, feed_name, limit)
+                               for feed_name in expired_feeds}
+                fetched_feeds = {feed_name: fetch.result() for feed_name, fetch in fetches.items()}
             else:
-                generator = subreddit.top(limit=limit)
+                # A single Reddit instance can't be shared between threads, so the feeds are fetched in turn
+                fetched_feeds = {feed_name: _fetch_feed(self._reddit, self.subreddit, feed_name, limit)
+                                 for feed_name in expired_feeds}
 
-            # Fetch posts from feed
-            for submission in generator:
-                new_post = Post(submission.id, submission.title, submission.score)
-                # If post already in set, replace with more current score
-                self.posts.discard(new_post)
-                self.posts.add(new_post)
-
-            # Update cache age
-            self.feed_ages[feed_name] = curr_time
+            # Posts are merged on this thread in feed order
+            for feed_name, fetched in fetched_feeds.items():
+                self._merge_feed(feed_name, fetched, curr_time)
 
         # Show cache size after refresh
         print(f"Cached posts: {len(self.posts)}")
-        return refreshed
+        return len(expired_feeds) > 0
+
+    def _merge_feed(self, feed_name: str, fetched: [(str, str, int)], refresh_time: float) -> None:
+        """
+        Adds the posts fetched from a feed to the cache and updates the age of the feed
+
+        :param feed_name: The name of the feed the posts were fetched from
+        :param fetched: A list of (ID, title, score) tuples for each post in the feed
+        :param refresh_time: The time the feed was refreshed
+        """
+        for post_id, title, score in fetched:
+            # If post already cached, replace with more current score
+            self.posts[post_id] = Post(post_id, title, score)
+
+        # Update cache age
+        self.feed_ages[feed_name] = refresh_time
+
+    def _is_modified(self) -> bool:
+        """
+        Checks whether the cache file was modified by something else since this cache last read or wrote it
+
+        :return: `True` if the cache file is missing or has been modified
+        """
+        return not os.path.exists(self._cache_file) or os.stat(self._cache_file).st_mtime_ns != self._file_mtime
 
     def save(self) -> None:
         """
         Writes contents of the PostCache to a file. Data in existing file is
-        read in, updated, then written back, so as to preserve any fields required
-        by different software versions.
+        updated, then written back, so as to preserve any fields required
+        by different software versions. The fields read when the cache was
+        loaded are reused, unless the file has been modified since then.
         """
         if not os.path.exists(self._cache_file):
             raise FileNotFoundError(f"Could not locate cache file at '{self._cache_file}'")
 
-        # Load data from cache file
-        with open(self._cache_file, 'r') as fp:
-            data = json.load(fp)
+        # Load data from cache file, if it has changed since it was read
+        if os.stat(self._cache_file).st_mtime_ns == self._file_mtime:
+            data = dict(self._file_fields)
+        else:
+            data = _read_json(self._cache_file)
 
         # Update cache data
         data["feed_ages"] = self.feed_ages
-        data["posts"] = [post.to_dict() for post in self.posts]
+        data["posts"] = [post.to_dict() for post in self.posts.values()]
 
         # Save updated data to file
-        with open(self._cache_file, 'w') as fp:
-            json.dump(data, fp)
-            print(f"Subreddit '{self.subreddit}' saved to cache.")
+        _write_json(self._cache_file, data)
+        self._file_mtime = os.stat(self._cache_file).st_mtime_ns
+        self._file_fields = {key: value for key, value in data.items() if key != "posts"}
+        print(f"Subreddit '{self.subreddit}' saved to cache.")
+
+
+def _fetch_feed(reddit: "praw.Reddit", subreddit_name: str, feed_name: str, limit: int = None) -> [(str, str, int)]:
+    """
+    Fetches the posts in one of a subreddit's feeds
+
+    :param reddit: The praw.Reddit instance to fetch with. It must not be in use by another thread
+    :param subreddit_name: The name of the subreddit to fetch from
+    :param feed_name: The name of the feed ("hot", "new", or "top")
+    :param limit: The maximum number of posts PRAW will fetch. If `None`, fetches as many as possible (~1000)
+
+    :return: A list of (ID, title, score) tuples for each post in the feed
+    """
+    subreddit = reddit.subreddit(subreddit_name)
+    if feed_name == "hot":
+        generator = subreddit.hot(limit=limit)
+    elif feed_name == "new":
+        generator = subreddit.new(limit=limit)
+    else:
+        generator = subreddit.top(limit=limit)
+    return [(sys.intern(submission.id), submission.title, submission.score) for submission in generator]
+
+
+def _read_json(path: str):
+    """
+    Reads and decodes a JSON file in a single read. Uses orjson if it is installed
+
+    :param path: The path of the JSON file
+
+    :return: The decoded contents of the file
+    """
+    with open(path, 'rb') as fp:
+        contents = fp.read()
+    return orjson.loads(contents) if orjson else json.loads(contents)
+
+
+def _write_json(path: str, data) -> None:
+    """
+    Encodes data as compact JSON and writes it to a file in a single write. Uses orjson if it is installed.
+    The data is written to a temporary file which then replaces the original, so the file is never left
+    partially written
+
+    :param path: The path of the JSON file
+    :param data: The data to encode
+    """
+    encoded = orjson.dumps(data) if orjson else json.dumps(data, separators=(',', ':')).encode('utf-8')
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as fp:
+        fp.write(encoded)
+    os.replace(temp_path, path)
 
 
 def validate_cache_version(seddit: str, file: str) -> bool:
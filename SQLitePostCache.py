@@ -0,0 +1,190 @@
+"""
+A PostCache which stores its posts in an SQLite database instead of a JSON file.
+Posts are written to the database as each feed is refreshed, so saving only
+writes the posts that were fetched, rather than rewriting the whole cache
+"""
+
+import os
+import sqlite3
+import sys
+from typing import TYPE_CHECKING
+
+from data import TOKENIZER_VERSION, Post
+from PostCache import PostCache, validate_cache_version
+
+if TYPE_CHECKING:
+    import praw
+
+_SCHEMA = """
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE feed_ages (feed TEXT PRIMARY KEY, refreshed REAL NOT NULL);
+CREATE TABLE posts (id TEXT PRIMARY KEY, title TEXT NOT NULL, score INTEGER NOT NULL, tokens TEXT NOT NULL)
+    WITHOUT ROWID;
+"""
+
+
+class SQLitePostCache(PostCache):
+    _CACHE_FORMAT_VERSION = "1.0"
+
+    def __init__(self,
+                 subreddit: str,
+                 cache_file: str,
+                 reddit: "praw.Reddit",
+                 hot_ttl: int = 86400,
+                 new_ttl: int = 21600,
+                 top_ttl: int = 2592000):
+        """
+        Creates a cache of posts from a subreddit. Posts will be loaded from
+        an SQLite database. If the database cannot be located, an empty one
+        will be created at the specified location
+
+        :param subreddit: The name of the subreddit the posts are scraped from
+        :param cache_file: The path of the database file
+        :param reddit: The praw.Reddit instance used to refresh the cache, or a function which creates one.
+            The function is only called once a feed needs to be refreshed, and is called once for each feed
+            so the feeds can be fetched concurrently
+        :param hot_ttl: The number of seconds before the hot feed is refreshed (Default: 24 hours)
+        :param new_ttl: The number of seconds before the new feed is refreshed (Default: 6 hours)
+        :param top_ttl: The number of seconds before the top feed is refreshed (Default: 30 days)
+        """
+        self._init_fields(subreddit, cache_file, reddit, hot_ttl, new_ttl, top_ttl)
+
+        # If no database found, create one
+        if not os.path.exists(self._cache_file):
+            print(f"Alert: No cache file found for {subreddit} at '{self._cache_file}'")
+            self._connection = _connect(self._cache_file)
+            with self._connection:
+                self._connection.executescript(_SCHEMA)
+                self._connection.executemany("INSERT INTO info (key, value) VALUES (?, ?)",
+                                             [("version", SQLitePostCache._CACHE_FORMAT_VERSION),
+                                              ("subreddit", self.subreddit),
+                                              ("tokenizer", TOKENIZER_VERSION)])
+                self._connection.executemany("INSERT INTO feed_ages (feed, refreshed) VALUES (?, ?)",
+                                             self.feed_ages.items())
+            self._data_version = self._read_data_version()
+            print("Created new cache file")
+            return
+
+        # If database exists, load it
+        print(f"Checking cache for /r/{self.subreddit}")
+        self._connection = _connect(self._cache_file)
+        try:
+            info = dict(self._connection.execute("SELECT key, value FROM info"))
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Could not read cache database at '{self._cache_file}': {e}")
+
+        # Validate database
+        for key in ["version", "subreddit"]:
+            if key not in info:  # Check that cache has all required keys
+                raise ValueError(f"Cache contains no key '{key}'")
+
+        if not validate_cache_version(SQLitePostCache._CACHE_FORMAT_VERSION, info["version"]):
+            raise ValueError(f"Unsupported cache version: Expected '{SQLitePostCache._CACHE_FORMAT_VERSION}', "
+                             f"was '{info['version']}'")
+
+        if info["subreddit"].lower() != self.subreddit.lower():  # Check subreddit
+            raise ValueError(f"Cache contains incorrect subreddit: Expected '{self.subreddit.lower()}', "
+                             f"was '{info['subreddit'].lower()}'")
+
+        # Convert rows to Post objects and store. IDs are interned, as in PostCache. The words of each title
+        # are stored separated by spaces, which is much faster to split than to tokenize the title again
+        rows = self._connection.execute("SELECT id, title, score, tokens FROM posts")
+        tokens_current = info.get("tokenizer") == TOKENIZER_VERSION
+        if tokens_current:
+            posts = (Post(sys.intern(post_id), title, score, frozenset(tokens.split(" ")) if tokens else frozenset())
+                     for post_id, title, score, tokens in rows)
+        else:
+            posts = (Post(sys.intern(post_id), title, score) for post_id, title, score, _ in rows)
+        self.posts = {post.postID: post for post in posts}
+
+        # If the words were stored by a different tokenizer, store the words just found in their place
+        if not tokens_current:
+            print("Alert: Cached title words are out of date - Updating cache...")
+            with self._connection:
+                self._connection.executemany("UPDATE posts SET tokens = ? WHERE id = ?",
+                                             ((" ".join(post.term_list(None)), post.postID)
+                                              for post in self.posts.values()))
+                self._connection.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('tokenizer', ?)",
+                                         (TOKENIZER_VERSION,))
+        self.feed_ages.update(self._connection.execute("SELECT feed, refreshed FROM feed_ages"))
+        self._data_version = self._read_data_version()  # Used to tell if another connection changed the database
+
+        # Show cache size
+        print(f"Cached posts: {len(self.posts)}")
+
+    def refresh(self,
+                force: bool = False,
+                limit: int = None):
+        """
+        Updates the cache for the specified feed(s) if any of the following conditions are true:
+            - Feed ttl has expired
+            - Cache is being force refreshed
+
+        The posts fetched are written to the database in a single transaction
+
+        :param force: If `True`, cache will refresh even if it hasn't expired yet (Default: False)
+        :param limit: The feed limit for PRAW. Determines the maximum number of posts PRAW will fetch
+            when refreshing the feeds. The lower the number, the faster it will refresh, but the less
+            data will be collected. To collect the maximum number (~1000), set to `None` (Default: None)
+
+        :return: Returns `True` if the feed was refreshed, `False` otherwise
+        """
+        with self._connection:
+            return super().refresh(force, limit)
+
+    def _merge_feed(self, feed_name: str, fetched: [(str, str, int)], refresh_time: float) -> None:
+        """
+        Adds the posts fetched from a feed to the cache and the database, and updates the age of the feed
+
+        :param feed_name: The name of the feed the posts were fetched from
+        :param fetched: A list of (ID, title, score) tuples for each post in the feed
+        :param refresh_time: The time the feed was refreshed
+        """
+        super()._merge_feed(feed_name, fetched, refresh_time)
+        rows = ((post_id, title, score, " ".join(self.posts[post_id].term_list(None)))
+                for post_id, title, score in fetched)
+        self._connection.executemany("INSERT OR REPLACE INTO posts (id, title, score, tokens) VALUES (?, ?, ?, ?)",
+                                     rows)
+        self._connection.execute("INSERT OR REPLACE INTO feed_ages (feed, refreshed) VALUES (?, ?)",
+                                 (feed_name, refresh_time))
+
+    def _is_modified(self) -> bool:
+        """
+        Checks whether the database was modified by another connection since this cache loaded it
+
+        :return: `True` if the database is missing or has been modified
+        """
+        return not os.path.exists(self._cache_file) or self._read_data_version() != self._data_version
+
+    def _read_data_version(self) -> int:
+        """
+        :return: The database's data version, which changes whenever another connection commits to it
+        """
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def save(self) -> None:
+        """
+        Commits any changes to the database. Posts are written as they are fetched,
+        so unlike PostCache, the cache is never rewritten as a whole
+        """
+        if not os.path.exists(self._cache_file):
+            raise FileNotFoundError(f"Could not locate cache file at '{self._cache_file}'")
+
+        self._connection.commit()
+        print(f"Subreddit '{self.subreddit}' saved to cache.")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    Opens a connection to a cache database. The database is put in WAL mode, so that a refresh appends
+    the posts it writes to a log instead of rewriting pages of the database, and is only synced to disk
+    at checkpoints rather than on every commit
+
+    :param path: The path of the database file
+
+    :return: The connection to the database
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
@@ -9,6 +9,23 @@ Post - A post on a subreddit
 """
 import re
 
+import utils
+
+_WORD_RE = re.compile(r"\b[\w.]+'?[\w.]*\b")  # Matches 'words' (i.e. contiguous alphanumeric strings)
+# Caches may store the words found in each title. Any change to `_WORD_RE` or `tokenize` must
+# change this version, so those words are found again rather than reused
+TOKENIZER_VERSION = "1"
+
+
+def tokenize(title: str) -> frozenset:
+    """
+    Finds all 'words' in a title (i.e. contiguous alphanumeric strings)
+
+    :param title: The title to split into words. Should already be lowercase
+    :return: The set of unique words in the title
+    """
+    return frozenset(_WORD_RE.findall(title))
+
 
 class TermGroups:
 
@@ -24,6 +41,11 @@ class TermGroups:
         :param ignore_case: Ignore case for term matching (default: True)
         """
         self.groups = {}
+        self._pattern = None  # A single pattern matching the terms of every group
+        self._replacements = []  # The pattern and replacement of each group, in order
+        self._automaton = None  # Finds the groups whose terms a title contains, if pyahocorasick is installed
+        self._unindexed_groups = ()  # The groups with terms the automaton can't find, which are always tried
+        self._ignore_case = ignore_case
 
         # Exit early if 'groups' is None or empty
         if not groups:
@@ -32,12 +54,28 @@ class TermGroups:
         # Filter `None` as well as empty element lists, as these won't change anything
         groups = [group for group in groups if group is not None and len(group) > 0]
 
-        # Create regex filter for each term group
+        # Create regex filter for each term group. A later group with the same name replaces the earlier one
+        flags = re.IGNORECASE if ignore_case else 0
+        group_terms = {}
         for group in groups:
             # Compile all terms into a `(<A>|<B>|...)` regex string
             escaped_list = [re.escape(term) for term in group]
-            flags = re.IGNORECASE if ignore_case else 0
             self.groups[group[0]] = re.compile('\\b({})\\b'.format("|".join(escaped_list)), flags)
+            group_terms[group[0]] = group
+
+        if self.groups:
+            # Groups are replaced one after another, as a later group can match the name an earlier group
+            # replaced a term with (e.g. 'porygon 2' -> 'Porygon 2' -> 'Porygon2'). Names are used literally
+            self._replacements = [(pattern, name.replace("\\", "\\\\")) for name, pattern in self.groups.items()]
+            # Combine the groups into one pattern, so titles without any term are ruled out in a single scan
+            self._pattern = re.compile("|".join(pattern.pattern for pattern in self.groups.values()), flags)
+            # Lowercasing can change the length of non-ASCII terms, so when ignoring case, those are left out of
+            # the automaton and their groups are always tried instead. Only a few terms are usually not ASCII
+            if ignore_case:
+                self._unindexed_groups = tuple(index for index, terms in enumerate(group_terms.values())
+                                               if not all(term.isascii() for term in terms))
+                group_terms = {name: [term for term in terms if term.isascii()] for name, terms in group_terms.items()}
+            self._automaton = utils.build_automaton(list(group_terms.values()), ignore_case)
 
     def sanitize(self, title: str) -> str:
         """
@@ -47,28 +85,74 @@ class TermGroups:
         :param title: The title to sanitize
         :return: The title, with all instances of a term group replaced with the group name
         """
-        for group in self.groups:
-            title = self.groups[group].sub(group, title)
-        return title.strip()
+        return self.replace_terms(title)[0]
+
+    def replace_terms(self, title: str, title_lower: str = None) -> (str, int):
+        """
+        Sanitizes a title like `sanitize`, also counting the number of terms replaced
+
+        :param title: The title to sanitize
+        :param title_lower: The title in lowercase, if it is already known, so it isn't lowercased again
+        :return: The sanitized title, and the number of terms that were replaced
+        """
+        if self._pattern is None:
+            return title.strip(), 0
+
+        replacements = self._replacements
+        count = 0
+        index = 0
+        found = None  # The indices of the remaining groups whose terms are in the title, if known
+        while index < len(replacements):
+            # A single pass of the automaton finds the groups which can match, so only their patterns are run.
+            # Lowercasing can change the length of non-ASCII titles, so every group is tried on those instead
+            if found is None and self._automaton is not None and (not self._ignore_case or title.isascii()):
+                if not self._ignore_case:
+                    text = title
+                else:
+                    text = title_lower if title_lower is not None else title.lower()
+                found = {group for _, (_, indices) in self._automaton.iter(text) for group in indices}
+                found.update(self._unindexed_groups)
+                found = sorted((group for group in found if group >= index), reverse=True)
+            elif found is None and index == 0 and self._pattern.search(title) is None:
+                break
+            if found is not None:
+                if not found:
+                    break
+                index = found.pop()
+
+            pattern, replacement = replacements[index]
+            replaced_title, replaced = pattern.subn(replacement, title)
+            if replaced_title != title:
+                found = None  # The replacement may contain terms of later groups, so the title is searched again
+                title_lower = None
+            title = replaced_title
+            count += replaced
+            index += 1
+        return title.strip(), count
 
 
 class Post:
+    # Many posts are kept in memory, so avoid a __dict__ on each
+    __slots__ = ("postID", "title", "title_lower", "score", "_tokens")
 
-    def __init__(self, post_id: str, title: str, score: int):
+    def __init__(self, post_id: str, title: str, score: int, tokens: frozenset = None):
         """
         Represents a post on Reddit
         :param post_id: The ID
         :param title: The title of the post
         :param score: The score of the post
+        :param tokens: The words in the title, if they were already found, e.g. when loaded from a cache.
+            If `None`, the title is tokenized (Default: None)
         """
         self.postID = post_id
         self.title = title
+        self.title_lower = title.lower()  # Used for case-insensitive matching without repeatedly lowercasing
         self.score = score
+        # Words in the unmodified title. Cached since most searches don't use a term group
+        self._tokens = tokens if tokens is not None else tokenize(self.title_lower)
 
     def __eq__(self, other):
-        if isinstance(other, Post):
-            return self.postID == other.postID
-        return False
+        return type(other) is Post and self.postID == other.postID
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -76,36 +160,22 @@ class Post:
     def __hash__(self):
         return hash(self.postID)
 
-    def term_list(self,
-                  term_group: TermGroups,
-                  ignore_title_regex: str = None,
-                  require_title_regex: str = None) -> set:
+    def term_list(self, term_group: TermGroups) -> frozenset:
         """
         Returns a set of all unique words in the post title
 
         :param term_group: The TermGroup object for this query
-        :param ignore_title_regex: A regex pattern titles must NOT contain to be evaluated.
-        :param require_title_regex: A regex pattern titles must contain to be evaluated
 
         :return: The set of words in the post title
         """
-        title = self.title
-
-        # Check title against regex
-        if ignore_title_regex and re.search(ignore_title_regex, title):
-            return set()
-        if require_title_regex and re.search(require_title_regex, title) is None:
-            return set()
-
-        title = term_group.sanitize(title) if term_group else title
-
-        # Find all 'words' in the title (i.e. contiguous alphanumeric strings)
-        result = set()
-        for word in re.findall(r"\b[\w.]+'?[\w.]*\b", title.lower()):
-            result.add(word)
-
-        # Return words
-        return result
+        if not term_group:
+            return self._tokens
+
+        # If no terms were replaced, the title is unchanged, so the cached words can be reused
+        title, count = term_group.replace_terms(self.title, self.title_lower)
+        if count == 0:
+            return self._tokens
+        return tokenize(title.lower())
 
     def to_dict(self):
         """
@@ -12,16 +12,16 @@ to amass a database of posts on a subreddit.
 """
 
 import argparse
-from configparser import ConfigParser
+from configparser import ConfigParser, SectionProxy
 import os
-
-import praw
+import re
 
 import data
 import utils
 from PostCache import PostCache
+from SQLitePostCache import SQLitePostCache
 
-DEFAULT_CONFIG_FILE = "config\\default.ini"
+DEFAULT_CONFIG_FILE = os.path.join("config", "default.ini")
 VERSION = "v0.6.0"
 DESCRIPTION = f"Seddit {VERSION} - A Python Script for counting the number of " \
               f"instances a collection of terms get said on different subreddits"
@@ -62,6 +62,18 @@ def load_config(path: str, child_files: [str] = None) -> ConfigParser:
     return config
 
 
+def get_optional_int(section: SectionProxy, option: str) -> int:
+    """
+    Reads an integer from a section of a configuration file, which may be left blank
+
+    :param section: The section of the configuration file
+    :param option: The name of the field
+
+    :return: The value of the field, or `None` if it is blank or missing
+    """
+    return section.getint(option) if section.get(option) else None
+
+
 def load_params() -> argparse.Namespace:
     """
     Reads the parameters from the command line and returns
@@ -114,8 +126,8 @@ def load_params() -> argparse.Namespace:
                              'value to 50 or 100.')
     parser.add_argument('-s',
                         '--scoring',
+                        type=str.lower,
                         choices=['count', 'score'],
-                        default='count',
                         help="How words are scored. The default, 'count', counts the number of posts that each word "
                              "appears, finding the most common word. 'score' adds up the scores of every post "
                              "containing the word, finding the 'most liked' word.")
@@ -165,14 +177,11 @@ def main() -> None:
     # Whether to display a graph of the most popular terms
     show_graph = True if args.graph else config["DEFAULT"].getboolean("show_graph", fallback=False)
     # The post limit for refreshing feeds
-    try:
-        feed_limit = args.feed_limit if args.feed_limit else config["DEFAULT"].getint("feed_limit")
-        if feed_limit < 0:  # Change non-positive feed limit to "None"
-            feed_limit = None
-    except TypeError:
-        feed_limit = None  # Convert any non-number limit to None
+    feed_limit = args.feed_limit if args.feed_limit is not None else get_optional_int(config["DEFAULT"], "feed_limit")
+    if feed_limit is not None and feed_limit <= 0:  # Change non-positive feed limit to "None"
+        feed_limit = None
     # Method for scoring
-    scoring = args.scoring.lower()
+    scoring = args.scoring if args.scoring else (config["DEFAULT"].get("scoring") or "count").lower()
     if scoring == "count":
         method = PostCache.COUNT
     elif scoring == "score":
@@ -180,7 +189,7 @@ def main() -> None:
     else:
         raise ValueError(f"Unrecognized scoring method '{scoring}'")
     # Read frequency threshold
-    threshold = args.threshold if args.threshold else config.getint("Filters", "threshold")
+    threshold = args.threshold if args.threshold is not None else get_optional_int(config["Filters"], "threshold")
 
     """ Ingest CSV files """
 
@@ -188,10 +197,12 @@ def main() -> None:
     search_term_path = args.search_terms if args.search_terms else config["Files"]["search_terms"]
     search_terms = utils.ingest_csv(search_term_path) if search_term_path else None
 
-    # Read term groups from CSV
+    # Read term groups from CSV. These are only used when counting words, so they aren't compiled otherwise
     term_groups_path = args.term_groups if args.term_groups else config["Files"]["term_groups"]
-    terms_list = utils.ingest_csv(term_groups_path) if term_groups_path else None
-    term_groups = data.TermGroups(terms_list)
+    if term_groups_path and not search_terms:
+        term_groups = data.TermGroups(utils.ingest_csv(term_groups_path))
+    else:
+        term_groups = None
 
     # Read in word filter CSV files and flatten to 1D list
     word_set = set()
@@ -203,29 +214,47 @@ def main() -> None:
         word_filters = []
 
     for path in word_filters:
-        word_array = utils.ingest_csv(path)
         # Add every word in file to set
-        for row in word_array:
-            for word in row:
-                word_set.add(word.strip())
+        word_set |= utils.ingest_csv_flat(path)
+
+    filtered_words = frozenset(word_set) if word_set else None
 
-    filtered_words = list(word_set) if word_set else None
+    """ Compile regex filters """
+
+    # Title filters are checked against every post and word filters against every result,
+    # so they are compiled once here
+    ignore_title = re.compile(config["Regex"]["ignore_title"]) if config["Regex"]["ignore_title"] else None
+    require_title = re.compile(config["Regex"]["require_title"]) if config["Regex"]["require_title"] else None
+    ignore_word = re.compile(config["Regex"]["ignore_word"]) if config["Regex"]["ignore_word"] else None
+    require_word = re.compile(config["Regex"]["require_word"]) if config["Regex"]["require_word"] else None
 
     # ========================================================= Load Data
 
-    # Create PRAW reddit object
-    reddit = praw.Reddit(client_id=config["PRAW"]["client_id"],
-                         client_secret=config["PRAW"]["client_secret"],
-                         user_agent=config["PRAW"]["user_agent"])
+    # Create PRAW reddit object. PRAW is slow to import and set up, so this is deferred
+    # until the cache finds a feed that needs to be refreshed
+    def create_reddit():
+        import praw
+        return praw.Reddit(client_id=config["PRAW"]["client_id"],
+                           client_secret=config["PRAW"]["client_secret"],
+                           user_agent=config["PRAW"]["user_agent"])
+
+    # Select how the cache is stored
+    backend = (config["Cache"].get("backend") or "json").lower()
+    if backend == "json":
+        cache_class = PostCache
+    elif backend == "sqlite":
+        cache_class = SQLitePostCache
+    else:
+        raise ValueError(f"Unrecognized cache backend '{backend}'")
 
     # Load cache from file
-    cache_path = f"{config['Cache']['dir_path']}{os.path.sep}{sub_name.lower()}.json"
-    cache = PostCache(sub_name,
-                      cache_path,
-                      reddit,
-                      config["Cache"].getint("ttl_hot"),
-                      config["Cache"].getint("ttl_new"),
-                      config["Cache"].getint("ttl_top"))
+    cache_path = os.path.join(config["Cache"]["dir_path"], f"{sub_name.lower()}.{backend}")
+    cache = cache_class.get_or_create(sub_name,
+                                      cache_path,
+                                      create_reddit,
+                                      config["Cache"].getint("ttl_hot"),
+                                      config["Cache"].getint("ttl_new"),
+                                      config["Cache"].getint("ttl_top"))
 
     # Refresh cache
     if cache.refresh(force=force, limit=feed_limit):
@@ -236,30 +265,29 @@ def main() -> None:
     # Perform search term result if provided, otherwise perform word count
     if search_terms:
         result_dict = cache.search_terms(search_terms,
-                                         ignore_title_regex=config["Regex"]["ignore_title"],
-                                         require_title_regex=config["Regex"]["require_title"],
+                                         ignore_title_regex=ignore_title,
+                                         require_title_regex=require_title,
                                          method=method)
-    else:
-        result_dict = cache.count_words(term_group=term_groups,
-                                        ignore_title_regex=config["Regex"]["ignore_title"],
-                                        require_title_regex=config["Regex"]["require_title"],
-                                        method=method)
 
-    """ Filter results """
+        # Remove filtered words
+        if filtered_words:
+            utils.list_filter_dict(result_dict, filtered_words)
 
-    # Remove filtered words
-    if filtered_words:
-        utils.list_filter_dict(result_dict, filtered_words)
-
-    # Filter low-frequency words if not using search terms
-    if threshold is not None and not search_terms:
-        result_dict = utils.value_filter_dict(result_dict, threshold)
-
-    # Filter words by regex
-    if config["Regex"]["require_word"] or config["Regex"]["ignore_word"]:
-        utils.regex_filter_dict(result_dict,
-                                require=config["Regex"]["require_word"],
-                                remove=config["Regex"]["ignore_word"])
+        # Filter words by regex
+        if require_word or ignore_word:
+            utils.regex_filter_dict(result_dict,
+                                    require=require_word,
+                                    remove=ignore_word)
+    else:
+        # Filtered words, low-frequency words and the word regex filters are applied while counting
+        result_dict = cache.count_words(term_group=term_groups,
+                                        ignore_title_regex=ignore_title,
+                                        require_title_regex=require_title,
+                                        method=method,
+                                        filtered_words=filtered_words,
+                                        threshold=threshold,
+                                        ignore_word_regex=ignore_word,
+                                        require_word_regex=require_word)
 
     """ Sort words by frequency """
 
@@ -274,10 +302,9 @@ def main() -> None:
     print("===============================================\n")
 
     print("Popularity score:\n")
-    num = 1
-    for name, count in sorted_tuples:
-        print(f"{num}) {name} - {count}")
-        num += 1
+    # Printed in a single call, since there can be thousands of results
+    if sorted_tuples:
+        print("\n".join(f"{num}) {name} - {count}" for num, (name, count) in enumerate(sorted_tuples, 1)))
 
     """ Present graph if requested """
 
@@ -0,0 +1,75 @@
+"""
+Tests for the data classes
+
+Run with `python -m unittest` from the repository root
+"""
+import glob
+import os
+import random
+import unittest
+from unittest import mock
+
+import utils
+from data import TermGroups
+
+TERM_GROUPS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "term_groups")
+
+
+def sanitize_per_group(term_groups: TermGroups, title: str) -> str:
+    """
+    Sanitizes a title the way TermGroups originally did, with a separate substitution for each group
+
+    :param term_groups: The term groups to sanitize with
+    :param title: The title to sanitize
+    :return: The sanitized title
+    """
+    for group in term_groups.groups:
+        title = term_groups.groups[group].sub(group, title)
+    return title.strip()
+
+
+def sample_titles(groups: [[str]]) -> [str]:
+    """
+    Creates titles containing the terms of the groups, alone, in sentences, and next to each other
+
+    :param groups: The term groups
+    :return: The list of titles
+    """
+    terms = [term for group in groups for term in group]
+    titles = []
+    for term in terms:
+        titles += [term, term.lower(), term.upper(), f"I love {term}!", f"{term}s", f"x{term}", f"{term}-z"]
+
+    generator = random.Random(0)
+    words = terms + ["the", "a", "2", "z", "-", "best", "vs", "é", "İ"]
+    for _ in range(500):
+        titles.append(" ".join(generator.choice(words) for _ in range(generator.randint(1, 8))))
+    return titles
+
+
+class TermGroupsTest(unittest.TestCase):
+
+    def assert_matches_per_group(self):
+        for path in sorted(glob.glob(os.path.join(TERM_GROUPS_DIR, "*.csv"))):
+            groups = utils.ingest_csv(path)
+            titles = sample_titles(groups)
+            for ignore_case in (True, False):
+                term_groups = TermGroups(groups, ignore_case)
+                for title in titles:
+                    with self.subTest(file=os.path.basename(path), ignore_case=ignore_case, title=title):
+                        self.assertEqual(sanitize_per_group(term_groups, title), term_groups.sanitize(title))
+
+    def test_sanitize_matches_per_group(self):
+        self.assert_matches_per_group()
+
+    def test_sanitize_matches_per_group_without_automaton(self):
+        with mock.patch.object(utils, "ahocorasick", None):
+            self.assert_matches_per_group()
+
+    def test_longer_term_of_later_group(self):
+        term_groups = TermGroups(utils.ingest_csv(os.path.join(TERM_GROUPS_DIR, "pokemon.csv")))
+        self.assertEqual("Porygon2 and Porygon-Z", term_groups.sanitize("Porygon 2 and porygon z"))
+
+
+if __name__ == "__main__":
+    unittest.main()
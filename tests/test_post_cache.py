@@ -0,0 +1,32 @@
+"""
+Tests for the JSON cache
+
+Run with `python -m unittest` from the repository root
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from data import Post
+from PostCache import PostCache
+
+
+class CountWordsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.cache = PostCache("test", os.path.join(self.directory.name, "test.json"), None)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_mixed_case_filtered_words_are_removed(self):
+        self.cache.posts = {"a": Post("a", "The Tank is the best", 1)}
+        self.assertEqual({"is": 1, "best": 1}, dict(self.cache.count_words(filtered_words=["The", "TANK"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests for the SQLite cache backend
+
+Run with `python -m unittest` from the repository root
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from SQLitePostCache import SQLitePostCache
+
+
+class SQLitePostCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_cache(self) -> SQLitePostCache:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache = SQLitePostCache("test", self.path, None)
+        self.addCleanup(cache._connection.close)
+        return cache
+
+    def test_outdated_words_are_found_again(self):
+        cache = self.open_cache()
+        with cache._connection:
+            cache._merge_feed("hot", [("a", "Hello World", 3)], 1.0)
+
+        # Simulate a database written by a different tokenizer
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute("UPDATE posts SET tokens = 'stale'")
+            connection.execute("UPDATE info SET value = 'old' WHERE key = 'tokenizer'")
+        connection.close()
+
+        cache = self.open_cache()
+        self.assertEqual(frozenset({"hello", "world"}), cache.posts["a"].term_list(None))
+        (tokens,), = cache._connection.execute("SELECT tokens FROM posts")
+        self.assertEqual({"hello", "world"}, set(tokens.split(" ")))
+
+        # The updated words are reused once they are stored
+        cache = self.open_cache()
+        self.assertEqual(frozenset({"hello", "world"}), cache.posts["a"].term_list(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,19 @@
+"""
+Tests for the utility functions
+
+Run with `python -m unittest` from the repository root
+"""
+import unittest
+
+import utils
+
+
+class ListFilterDictTest(unittest.TestCase):
+
+    def test_mixed_case_words_are_removed(self):
+        dictionary = {"the": 5, "tank": 3, "mercy": 2}
+        self.assertEqual({"mercy": 2}, utils.list_filter_dict(dictionary, ["The", "TANK"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,8 +11,14 @@ of their posts.
 
 # Libraries
 import csv
+from operator import itemgetter
 import re
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 def ingest_csv(csv_path: str, delimiter: str = ',', strip_spaces: bool = True) -> [[str]]:
     """
@@ -34,6 +40,67 @@ def ingest_csv(csv_path: str, delimiter: str = ',', strip_spaces: bool = True) -
     return contents
 
 
+def ingest_csv_flat(csv_path: str, delimiter: str = ',') -> {str}:
+    """
+    Takes in a CSV file and returns the set of every non-empty cell in it, without building a list of its rows
+
+    :param csv_path: The path to the csv file
+    :param delimiter: The character which divides cells in the file's csv encoding. Defaults to ','
+    :return: {str} - The set of the contents of every cell, with spaces stripped from their ends
+    """
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        cells = (cell.strip() for row in csv.reader(csv_file, delimiter=delimiter) for cell in row)
+        return {cell for cell in cells if cell}
+
+
+def build_automaton(groups: [[str]], ignore_case: bool = True):
+    """
+    Builds an Aho-Corasick automaton which maps every term to its length and the indices of the groups
+    containing it. Only a substring search is done, so matches do not respect word boundaries.
+    These can be checked with `is_word_boundary`.
+
+    **Note:** Requires pyahocorasick. If a group contains an empty term, which matches any title,
+    `None` is returned, since the automaton cannot be used to rule that group out. `None` is also
+    returned when ignoring the case of non-ASCII terms, since lowercasing can change their length.
+
+    :param groups: List of lists, with each list being a group of words/phrases
+    :param ignore_case: Whether terms are lowercased, to be searched for in lowercased titles (Default: True)
+
+    :return: The automaton, or `None` if pyahocorasick is not installed or it would not find any terms
+    """
+    if ahocorasick is None:
+        return None
+
+    term_indices = {}
+    for index, group in enumerate(groups):
+        for term in group:
+            term = term.strip()
+            if not term or (ignore_case and not term.isascii()):
+                return None
+            term_indices.setdefault(term.lower() if ignore_case else term, set()).add(index)
+    if not term_indices:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for term, indices in term_indices.items():
+        automaton.add_word(term, (len(term), tuple(indices)))
+    automaton.make_automaton()
+    return automaton
+
+
+def is_word_boundary(text: str, index: int) -> bool:
+    """
+    Checks whether there is a word boundary before a position in a string, as matched by the regex `\\b`
+
+    :param text: The string to check
+    :param index: The position in the string. May be equal to the string's length, for the end of the string
+    :return: `True` if exactly one of the characters either side of the position is a word character
+    """
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == "_")
+    after = index < len(text) and (text[index].isalnum() or text[index] == "_")
+    return before != after
+
+
 def value_filter_dict(dictionary: dict, threshold, invert: bool = False):
     """
     Creates a copy of a dictionary with all elements removed whose
@@ -58,10 +125,10 @@ def list_filter_dict(dictionary: dict, remove: [str]) -> {str: any}:
 
     :return: The filtered dictionary
     """
-    remove = [key.lower() for key in remove]  # Make sure keys to remove are all lower
-    for word in remove:
-        if word in dictionary:
-            del dictionary[word]
+    remove = {key.lower() for key in remove}  # Make sure keys to remove are all lower
+    # Find the keys to remove in a single set operation, rather than looking up each word
+    for word in remove.intersection(dictionary):
+        del dictionary[word]
     return dictionary
 
 
@@ -70,9 +137,9 @@ def regex_filter_dict(dictionary: {str: any}, remove: str = None, require: str =
     Takes a {str: Any} dictionary and removes all keys that don't meet the regex requirements
 
     :param dictionary: The dictionary to filter
-    :param remove: All elements containing this pattern will be removed. If `None`,
+    :param remove: All elements containing this pattern (string or compiled) will be removed. If `None`,
             all elements will be kept (Default: None)
-    :param require: All elements that do not contain this pattern will be removed.
+    :param require: All elements that do not contain this pattern (string or compiled) will be removed.
             If `None`, all elements will be kept. (Default: None)
 
     :return: The filtered dictionary
@@ -81,13 +148,17 @@ def regex_filter_dict(dictionary: {str: any}, remove: str = None, require: str =
     if not remove and not require:
         return dictionary
 
-    # Perform key filter
-    for key in dictionary:
+    # Compile the patterns once, rather than looking them up for every key
+    remove = re.compile(remove).search if remove else None
+    require = re.compile(require).search if require else None
+
+    # Perform key filter. Keys are removed while filtering, so a copy of the keys is iterated over
+    for key in list(dictionary):
         # Remove key if it matches regex
-        if remove and re.search(remove, key):
+        if remove and remove(key):
             del dictionary[key]
         # Remove key if it does not contain required regex
-        elif require and re.search(require, key) is None:
+        elif require and require(key) is None:
             del dictionary[key]
 
     return dictionary
@@ -101,7 +172,8 @@ def sorted_dict(dictionary, reverse=True):
     :param reverse: Whether to reverse the sort
     :return: A sorted list of (key, value) tuples
     """
-    return sorted(dictionary.items(), reverse=reverse, key=lambda x: (x[1], x[0]))
+    # itemgetter builds each (value, key) sort key in C, rather than calling a lambda per item
+    return sorted(dictionary.items(), reverse=reverse, key=itemgetter(1, 0))
 
 
 def show_bar_chart(data: list, graph_title: str):